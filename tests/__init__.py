@@ -1,4 +1,6 @@
+import bisect
 import collections
+import functools
 import itertools
 import logging
 import os
@@ -6,17 +8,19 @@ import random
 
 import torf
 
-debug = logging.getLogger('test').debug
+log = logging.getLogger('test')
+debug = log.debug
 
 def display_filespecs(filespecs, piece_size):
     filecount = len(filespecs)
-    header = ['.' + ' ' * (((4 * filecount) + (2 * filecount - 1)) + 2 - 1)]
-    for i in range(8):
-        header.append(str(i) + ' ' * (piece_size - 1))
-    line = (', '.join(f'{fn}:{fs:2d}' for fn,fs in filespecs),
-            ' - ',
-            ''.join(fn * fs for fn,fs in filespecs))
-    debug(f'\n{"".join(header)}\n{"".join(line)}')
+    header = (
+        '.' + ' ' * (((4 * filecount) + (2 * filecount - 1)) + 2 - 1)
+        + ''.join(f'{i}{" " * (piece_size - 1)}' for i in range(8))
+    )
+    line = (', '.join(f'{fn}:{fs:2d}' for fn,fs in filespecs)
+            + ' - '
+            + ''.join(fn * fs for fn,fs in filespecs))
+    debug(f'\n{header}\n{line}')
 
 class fuzzylist(list):
     """
@@ -44,8 +48,8 @@ class fuzzylist(list):
     >>> x == ['a', 'x', 'b', 'x', 'c']
     False
 
-    Unlike `set(...) == set(...)`, this doesn't remove duplicate items and
-    allows unhashable items.
+    Unlike `set(...) == set(...)`, this doesn't remove duplicate items. Items
+    must be hashable.
     """
     def __init__(self, *args, maybe=(), max_maybe_items={}):
         self.maybe = list(maybe)
@@ -53,29 +57,38 @@ class fuzzylist(list):
         super().__init__(args)
 
     def __eq__(self, other):
-        if tuple(self) != tuple(other):
+        if self is other:
+            return True
+        elif (
+            len(self) != len(other)
+            and not self.maybe and not getattr(other, 'maybe', [])
+            and not self.max_maybe_items and not getattr(other, 'max_maybe_items', {})
+        ):
+            # Without optional items, both lists must have the same items
+            return False
+        elif tuple(self) != tuple(other):
+            self_counts = collections.Counter(self)
+            self_all_counts = self_counts + collections.Counter(self.maybe)
+            other_counts = collections.Counter(other)
+            other_all_counts = other_counts + collections.Counter(getattr(other, 'maybe', []))
             # Check if either list contains any disallowed items, accepting
             # items from `maybe`.
-            other_maybe = getattr(other, 'maybe', [])
-            for item in self:
-                if item not in other and item not in other_maybe:
+            for item in self_counts:
+                if item not in other_all_counts:
                     return False
-            self_maybe = self.maybe
-            for item in other:
-                if item not in self and item not in self_maybe:
+            for item in other_counts:
+                if item not in self_all_counts:
                     return False
             # Check if either list contains an excess of items.
             other_max = getattr(other, 'max_maybe_items', {})
-            for item in itertools.chain(self, self.maybe):
-                maxcount = max(other_max.get(item, 1),
-                               (other + other_maybe).count(item))
-                if self.count(item) > maxcount:
+            for item in self_all_counts:
+                maxcount = max(other_max.get(item, 1), other_all_counts[item])
+                if self_counts[item] > maxcount:
                     return False
             self_max = self.max_maybe_items
-            for item in itertools.chain(other, other_maybe):
-                maxcount = max(self_max.get(item, 1),
-                               (self + self_maybe).count(item))
-                if other.count(item) > maxcount:
+            for item in other_all_counts:
+                maxcount = max(self_max.get(item, 1), self_all_counts[item])
+                if other_counts[item] > maxcount:
                     return False
         return True
 
@@ -106,7 +119,7 @@ class fuzzydict(dict):
     e.g. fuzzydict(x=fuzzylist()) == {}
     """
     def __eq__(self, other):
-        if super().__eq__(other):
+        if self is other or super().__eq__(other):
             return True
         elif not isinstance(other, dict):
             return NotImplemented
@@ -125,6 +138,8 @@ class fuzzydict(dict):
     def __repr__(self):
         return f'{type(self).__name__}({super().__repr__()})'
 
+_comparable_exception_classes = {}
+
 def ComparableException(exc):
     """
     Horrible hack that allows us to compare exceptions comfortably
@@ -133,10 +148,20 @@ def ComparableException(exc):
     message.  Type checking with issubclass() and isinstance() also works as
     expected.
     """
-    # Make the returned class object an instance of the type of `exc` and the
-    # returned Comparable* class.
+    if not isinstance(exc, torf.TorfError):
+        raise exc
+
+    exc_cls = type(exc)
+    cls = _comparable_exception_classes.get(exc_cls)
+    if cls is None:
+        cls = _comparable_exception_classes[exc_cls] = _make_comparable_exception_class(exc_cls)
+    return cls(*exc.posargs, **exc.kwargs)
+
+def _make_comparable_exception_class(exc_cls):
+    # Make the returned class object an instance of `exc_cls` and the returned
+    # Comparable* class.
     class ComparableExceptionMeta(type):
-        _cls = type(exc)
+        _cls = exc_cls
 
         @classmethod
         def __subclasscheck__(mcls, cls):
@@ -147,10 +172,10 @@ def ComparableException(exc):
             return isinstance(cls, mcls._cls) or isinstance(cls, mcls)
 
     # Make subclass of the same name with "Comparable" prepended
-    clsname = 'Comparable' + type(exc).__name__
-    bases = (type(exc),)
+    clsname = 'Comparable' + exc_cls.__name__
+    bases = (exc_cls,)
 
-    def __eq__(self, other, _real_cls=type(exc)):
+    def __eq__(self, other, _real_cls=exc_cls):
         return isinstance(other, (type(self), _real_cls)) and str(self) == str(other)
 
     def __hash__(self):
@@ -160,10 +185,7 @@ def ComparableException(exc):
     attrs['__eq__'] = __eq__
     attrs['__hash__'] = __hash__
     cls = ComparableExceptionMeta(clsname, bases, attrs)
-    if isinstance(exc, torf.TorfError):
-        return cls(*exc.posargs, **exc.kwargs)
-    else:
-        raise exc
+    return cls
 
 def random_positions(stream):
     """Return list of 1 to 5 random indexes in `stream`"""
@@ -175,23 +197,28 @@ def change_file_size(filepath, original_size):
     diff_range = list(range(-original_size, original_size + 1))
     diff_range.remove(0)
     diff = random.choice(diff_range)
-    data = bytearray(open(filepath, 'rb').read())
-    debug(f'  Original data ({len(data)} bytes): {data}')
-    if diff > 0:
-        # Make add `diff` bytes at `pos`
-        pos = random.choice(range(original_size + 1))
-        data[pos:pos] = b'\xA0' * diff
-    elif diff < 0:
-        # Remove `abs(diff)` bytes at `pos`
-        pos = random.choice(range(original_size - abs(diff) + 1))
-        data[pos : pos + abs(diff)] = ()
-    with open(filepath, 'wb') as f:
-        f.write(data)
-        f.truncate()
+    debug(f'  Original size: {original_size} bytes')
+    with open(filepath, 'r+b') as f:
+        if diff > 0:
+            # Make add `diff` bytes at `pos`
+            pos = random.choice(range(original_size + 1))
+            f.seek(pos)
+            tail = f.read()
+            f.seek(pos)
+            f.write(b'\xA0' * diff + tail)
+        elif diff < 0:
+            # Remove `abs(diff)` bytes at `pos`
+            pos = random.choice(range(original_size - abs(diff) + 1))
+            f.seek(pos + abs(diff))
+            tail = f.read()
+            f.seek(pos)
+            f.write(tail)
+            f.truncate()
     assert os.path.getsize(filepath) == original_size + diff
-    debug(f'  Changed data ({len(data)} bytes): {data}')
     with open(filepath, 'rb') as f:
-        return f.read()
+        data = f.read()
+    debug(f'  Changed data ({len(data)} bytes): {data}')
+    return data
 
 def round_up_to_multiple(n, x):
     """Round `n` up to the next multiple of `x`"""
@@ -204,21 +231,38 @@ def round_down_to_multiple(n, x):
     else:
         return n
 
-def file_range(filename, filespecs):
-    """Return `filename`'s first and last byte index in stream"""
+@functools.lru_cache(maxsize=4096)
+def _index_filespecs(filespecs):
+    """
+    Return file names, first byte indexes, last byte indexes and a map of file
+    names to (first byte index, last byte index) tuples
+    """
+    names, offsets, ends, name_to_range = [], [], [], {}
     pos = 0
     for fn,size in filespecs:
-        if fn == filename:
-            return pos, pos + size - 1
+        names.append(fn)
+        offsets.append(pos)
+        ends.append(pos + size - 1)
+        name_to_range.setdefault(fn, (pos, pos + size - 1))
         pos += size
-    raise RuntimeError(f'Could not find {filename} in {filespecs}')
+    return names, offsets, ends, name_to_range
 
+def file_range(filename, filespecs):
+    """Return `filename`'s first and last byte index in stream"""
+    try:
+        return _index_filespecs(tuple(filespecs))[3][filename]
+    except KeyError:
+        raise RuntimeError(f'Could not find {filename} in {filespecs}')
+
+@functools.lru_cache(maxsize=4096)
 def file_piece_indexes(filename, filespecs, piece_size, exclusive=False):
     """
-    Return list of indexes of pieces that contain bytes from `filename`
+    Return tuple of indexes of pieces that contain bytes from `filename`
 
     If `exclusive` is True, don't include pieces that contain bytes from
     multiple files.
+
+    `filespecs` must be hashable, e.g. a tuple of (filename, filesize) tuples.
     """
     file_beg,file_end = file_range(filename, filespecs)
     first_piece_index_pos = round_down_to_multiple(file_beg, piece_size)
@@ -226,39 +270,37 @@ def file_piece_indexes(filename, filespecs, piece_size, exclusive=False):
     for pos in range(first_piece_index_pos, file_end + 1, piece_size):
         if not exclusive or len(pos2files(pos, filespecs, piece_size)) == 1:
             piece_indexes.append(pos // piece_size)
-    return piece_indexes
+    return tuple(piece_indexes)
 
+@functools.lru_cache(maxsize=4096)
 def pos2files(pos, filespecs, piece_size, include_file_at_pos=True):
     """
-    Calculate which piece the byte at `pos` belongs to and return a list of file
-    names of those files that are covered by that piece.
+    Calculate which piece the byte at `pos` belongs to and return a tuple of
+    file names of those files that are covered by that piece.
+
+    `filespecs` must be hashable, e.g. a tuple of (filename, filesize) tuples.
     """
-    p = 0
-    filenames = []
-    for filename,filesize in filespecs:
-        filepos_beg = p
-        filepos_end = filepos_beg + filesize - 1
-        first_piece_index = filepos_beg // piece_size
-        last_piece_index = filepos_end // piece_size
-        first_piece_index_pos_beg = first_piece_index * piece_size
-        last_piece_index_pos_end = (last_piece_index + 1) * piece_size - 1
-        if first_piece_index_pos_beg <= pos <= last_piece_index_pos_end:
-            filenames.append(filename)
-        p += filesize
+    names, offsets, ends, _ = _index_filespecs(tuple(filespecs))
+    piece_pos_beg = (pos // piece_size) * piece_size
+    piece_pos_end = piece_pos_beg + piece_size - 1
+    # Files that end at or after the first byte of the piece and begin at or
+    # before the last byte of the piece
+    first = bisect.bisect_left(ends, piece_pos_beg)
+    last = bisect.bisect_right(offsets, piece_pos_end)
+    filenames = tuple(names[first:last])
 
     if not include_file_at_pos:
         file_at_pos,_ = pos2file(pos, filespecs, piece_size)
-        return [f for f in filenames if f != file_at_pos]
+        return tuple(f for f in filenames if f != file_at_pos)
     else:
         return filenames
 
 def pos2file(pos, filespecs, piece_size):
     """Return file name and relative position of `pos` in file"""
-    p = 0
-    for filename,filesize in filespecs:
-        if p <= pos < p + filesize:
-            return (filename, pos - p)
-        p += filesize
+    names, offsets, ends, _ = _index_filespecs(tuple(filespecs))
+    i = bisect.bisect_right(offsets, pos) - 1
+    if 0 <= pos and 0 <= i and pos <= ends[i]:
+        return (names[i], pos - offsets[i])
     raise RuntimeError(f'Could not find file at position {pos} in {filespecs}')
 
 def calc_piece_indexes(filespecs, piece_size, files_missing=(), files_missized=()):
@@ -267,20 +309,25 @@ def calc_piece_indexes(filespecs, piece_size, files_missing=(), files_missized=(
     names to the piece indexes they cover. Pieces that overlap multiple files
     belong to the last file they cover.
     """
+    names, offsets, ends, _ = _index_filespecs(tuple(filespecs))
+    first_pis = [offset // piece_size for offset in offsets]
+    last_pis = [end // piece_size for end in ends]
+    # Number of files that have bytes in each piece
+    files_per_piece = collections.Counter(itertools.chain.from_iterable(
+        range(first_pi, last_pi + 1) for first_pi, last_pi in zip(first_pis, last_pis)
+    ))
+
     piece_indexes = collections.defaultdict(lambda: fuzzylist())
-    pos = 0
-    for i, (filename, filesize) in enumerate(filespecs):
-        # Piece indexes that cover only one file must be reported for that file.
-        exclusive_file_pis = file_piece_indexes(filename, filespecs, piece_size, exclusive=True)
-        # Piece indexes that cover multiple files may be reported for any of
-        # those files.
-        multiple_file_pis = [
-            pi for pi in file_piece_indexes(filename, filespecs, piece_size, exclusive=False)
-            if pi not in exclusive_file_pis
-        ]
-        piece_indexes[filename].extend(exclusive_file_pis)
-        piece_indexes[filename].maybe.extend(multiple_file_pis)
-        pos += filesize
+    for filename, first_pi, last_pi in zip(names, first_pis, last_pis):
+        for pi in range(first_pi, last_pi + 1):
+            if files_per_piece[pi] == 1:
+                # Piece indexes that cover only one file must be reported for
+                # that file.
+                piece_indexes[filename].append(pi)
+            else:
+                # Piece indexes that cover multiple files may be reported for
+                # any of those files.
+                piece_indexes[filename].maybe.append(pi)
 
     # Remove empty lists
     for k in tuple(piece_indexes):
@@ -304,6 +351,7 @@ def calc_good_pieces(filespecs, piece_size, files_missing, corruption_positions,
     Same as `calc_piece_indexes`, but exclude corrupt pieces and pieces of
     missing or missized files
     """
+    filespecs = tuple(filespecs)
     debug('* Calculating good pieces')
     all_piece_indexes = calc_piece_indexes(filespecs, piece_size, files_missing, files_missized)
     bad_pis = {corrpos // piece_size for corrpos in corruption_positions}
@@ -343,13 +391,13 @@ def skip_good_pieces(good_pieces, filespecs, piece_size, corruption_positions):
     For each file in `good_pieces`, remove piece_indexes between the first
     corruption and the end of the file
     """
+    filespecs = tuple(filespecs)
     debug('* Skipping good pieces after corruptions')
     # Find out which piece_indexes should be skipped
     skipped_pis = set()
-    for corrpos in sorted(corruption_positions):
-        corr_pi = corrpos // piece_size
-        affected_files = pos2files(corrpos, filespecs, piece_size)
-        debug(f'  corruption at position {corrpos}, piece_index {corr_pi}: {affected_files}')
+    for corr_pi in sorted({corrpos // piece_size for corrpos in corruption_positions}):
+        affected_files = pos2files(corr_pi * piece_size, filespecs, piece_size)
+        debug(f'  corruption in piece_index {corr_pi}: {affected_files}')
         for file in affected_files:
             file_pis_exclusive = file_piece_indexes(file, filespecs, piece_size, exclusive=True)
             debug(f'    {file}: piece_indexes exclusive: {file_pis_exclusive}')
@@ -381,19 +429,20 @@ def skip_good_pieces(good_pieces, filespecs, piece_size, corruption_positions):
 
 def calc_corruptions(filespecs, piece_size, corruption_positions):
     """Map file names to (piece_index, exception) tuples"""
-    exceptions = []
-    reported = set()
+    filespecs = tuple(filespecs)
+    # Map each corrupt piece_index to its first corruption position
+    first_corrpositions = {}
     for corrpos in sorted(corruption_positions):
-        corr_pi = corrpos // piece_size
-        if corr_pi not in reported:
-            filepath, _ = pos2file(corrpos, filespecs, piece_size)
-            exc = ComparableException(torf.VerifyContentError(filepath, corr_pi, piece_size, filespecs))
-            exceptions.append(exc)
-            reported.add(corr_pi)
+        first_corrpositions.setdefault(corrpos // piece_size, corrpos)
+    exceptions = []
+    for corr_pi, corrpos in first_corrpositions.items():
+        filepath, _ = pos2file(corrpos, filespecs, piece_size)
+        exceptions.append(ComparableException(torf.VerifyContentError(filepath, corr_pi, piece_size, filespecs)))
     return fuzzylist(*exceptions)
 
 def skip_corruptions(all_corruptions, filespecs, piece_size, corruption_positions, files_missing, files_missized):
     """Make every non-first corruption optional"""
+    filespecs = tuple(filespecs)
     debug(f'Skipping corruptions: {all_corruptions}')
     pis_seen = set()
     files_seen = set()
@@ -452,24 +501,24 @@ def calc_pieces_done(filespecs_abspath, piece_size, files_missing=(), files_miss
     pieces_done_list = list((pi // piece_size) + 1
                             for pi in range(0, total_size, piece_size))
     debug(f'  progress reports: {pieces_done_list}')
-    # List of pieces_done values that may appear multiple times
-    maybes = set()
-    # Map pieces_done values to the number of times they may appear
-    max_maybe_items = collections.defaultdict(lambda: 1)
-
     # Missing or missized files are reported in addition to progress reports
     files_missing = {str(filepath) for filepath in files_missing}
     debug(f'  files_missing: {files_missing}')
     files_missized = {str(filepath) for filepath in files_missized}
     debug(f'  files_missized: {files_missized}')
-    for filepath in files_missing.union(files_missized):
-        # Because we're multithreaded, we can't expect the missing/missized file
-        # to be reported at its first piece.  We can't predict at all when the
-        # error is reported.  The only thing we can savely say that for each
-        # missing/missized file, every pieces_done_value *may* increase by 1.
-        for pieces_done_value in pieces_done_list:
-            maybes.add(pieces_done_value)
-            max_maybe_items[pieces_done_value] += 1
+    # Because we're multithreaded, we can't expect the missing/missized file to
+    # be reported at its first piece.  We can't predict at all when the error is
+    # reported.  The only thing we can savely say that for each missing/missized
+    # file, every pieces_done_value *may* increase by 1.
+    files_reported = len(files_missing.union(files_missized))
+    if files_reported:
+        # List of pieces_done values that may appear multiple times
+        maybes = set(pieces_done_list)
+        # Map pieces_done values to the number of times they may appear
+        max_maybe_items = {value: 1 + files_reported for value in pieces_done_list}
+    else:
+        maybes = set()
+        max_maybe_items = {}
 
     fuzzy_pieces_done_list = fuzzylist(*pieces_done_list,
                                        maybe=sorted(maybes),
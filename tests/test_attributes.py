@@ -1,5 +1,4 @@
 import copy
-import glob
 import math
 import os
 import pickle
@@ -14,6 +13,20 @@ import torf
 from torf import _errors as errors
 from torf import _utils as utils
 
+_pieces_cache = {}
+
+def _generate(torrent):
+    # Many tests hash the same few bytes only to get 'pieces' into the
+    # metainfo, so only hash any combination of content and piece size once
+    key = (torrent.name, torrent.piece_size,
+           tuple((str(filepath.relative_to(torrent.path)), filepath.read_bytes())
+                 for filepath in map(Path, torrent.filepaths)))
+    if key not in _pieces_cache:
+        torrent.generate()
+        _pieces_cache[key] = torrent.metainfo['info']['pieces']
+    else:
+        torrent.metainfo['info']['pieces'] = _pieces_cache[key]
+
 
 def test_path_doesnt_exist(create_torrent):
     torrent = create_torrent()
@@ -46,12 +59,10 @@ def test_path_is_directory_with_empty_file(create_torrent, tmp_path):
     for key in ('name', 'files', 'length', 'pieces'):
         assert key not in torrent.metainfo['info']
 
-def test_path_reset(create_torrent, singlefile_content, multifile_content):
-    torrent = create_torrent()
-    torrent.path = singlefile_content.path
+def test_path_reset(generated_singlefile_torrent, singlefile_content, multifile_content):
+    torrent = generated_singlefile_torrent
     assert torrent.path == Path(singlefile_content.path)
     torrent.private = True
-    torrent.generate()
     assert 'pieces' in torrent.metainfo['info']
     assert torrent.metainfo['info']['private'] is True
     assert torrent.metainfo['info']['name'] == os.path.basename(singlefile_content.path)
@@ -77,57 +88,49 @@ def test_path_reset(create_torrent, singlefile_content, multifile_content):
     assert torrent.metainfo['info']['name'] == os.path.basename(multifile_content.path)
     assert torrent.metainfo['info']['files'] == multifile_content.exp_metainfo['info']['files']
 
-def test_path_switch_from_singlefile_to_multifile(create_torrent, singlefile_content, multifile_content):
-    torrent = create_torrent()
-    torrent.path = singlefile_content.path
-    assert torrent.path == Path(singlefile_content.path)
-    assert torrent.metainfo['info']['name'] == singlefile_content.exp_metainfo['info']['name']
-    assert torrent.metainfo['info']['length'] == singlefile_content.exp_metainfo['info']['length']
-    assert 'files' not in torrent.metainfo['info']
+def _assert_path_is_content(torrent, content):
+    exp_info = content.exp_metainfo['info']
+    assert torrent.path == Path(content.path)
+    assert torrent.metainfo['info']['name'] == exp_info['name']
+    if 'files' in exp_info:
+        assert torrent.metainfo['info']['files'] == exp_info['files']
+        assert 'length' not in torrent.metainfo['info']
+    else:
+        assert torrent.metainfo['info']['length'] == exp_info['length']
+        assert 'files' not in torrent.metainfo['info']
 
-    torrent.path = multifile_content.path
-    assert torrent.path == Path(multifile_content.path)
-    assert torrent.metainfo['info']['name'] == multifile_content.exp_metainfo['info']['name']
-    assert torrent.metainfo['info']['files'] == multifile_content.exp_metainfo['info']['files']
-    assert 'length' not in torrent.metainfo['info']
+@pytest.mark.parametrize(
+    argnames='first, second',
+    argvalues=(
+        ('singlefile_content', 'multifile_content'),
+        ('multifile_content', 'singlefile_content'),
+    ),
+    ids=['singlefile to multifile', 'multifile to singlefile'],
+)
+def test_path_switch(first, second, create_torrent, request):
+    first_content = request.getfixturevalue(first)
+    second_content = request.getfixturevalue(second)
+    torrent = create_torrent()
+    torrent.path = first_content.path
+    _assert_path_is_content(torrent, first_content)
+    torrent.path = second_content.path
+    _assert_path_is_content(torrent, second_content)
 
-def test_path_switch_from_multifile_to_singlefile(create_torrent, singlefile_content, multifile_content):
+def test_path_is_period(create_torrent, multifile_content, monkeypatch):
     torrent = create_torrent()
-    torrent.path = multifile_content.path
-    assert torrent.path == Path(multifile_content.path)
-    assert torrent.metainfo['info']['name'] == multifile_content.exp_metainfo['info']['name']
+    monkeypatch.chdir(multifile_content.path)
+    torrent.path = os.curdir
+    assert torrent.path == Path(os.curdir)
+    assert torrent.metainfo['info']['name'] == os.path.basename(multifile_content.path)
     assert torrent.metainfo['info']['files'] == multifile_content.exp_metainfo['info']['files']
-    assert 'length' not in torrent.metainfo['info']
-
-    torrent.path = singlefile_content.path
-    assert torrent.path == Path(singlefile_content.path)
-    assert torrent.metainfo['info']['name'] == singlefile_content.exp_metainfo['info']['name']
-    assert torrent.metainfo['info']['length'] == singlefile_content.exp_metainfo['info']['length']
-    assert 'files' not in torrent.metainfo['info']
 
-def test_path_is_period(create_torrent, multifile_content):
-    torrent = create_torrent()
-    cwd = os.getcwd()
-    try:
-        os.chdir(multifile_content.path)
-        torrent.path = os.curdir
-        assert torrent.path == Path(os.curdir)
-        assert torrent.metainfo['info']['name'] == os.path.basename(multifile_content.path)
-        assert torrent.metainfo['info']['files'] == multifile_content.exp_metainfo['info']['files']
-    finally:
-        os.chdir(cwd)
-
-def test_path_is_double_period(create_torrent, multifile_content):
+def test_path_is_double_period(create_torrent, multifile_content, monkeypatch):
     torrent = create_torrent()
-    cwd = os.getcwd()
-    try:
-        os.chdir(os.path.join(multifile_content.path, 'subdir'))
-        torrent.path = os.pardir
-        assert torrent.path == Path(os.pardir)
-        assert torrent.metainfo['info']['name'] == os.path.basename(multifile_content.path)
-        assert torrent.metainfo['info']['files'] == multifile_content.exp_metainfo['info']['files']
-    finally:
-        os.chdir(cwd)
+    monkeypatch.chdir(os.path.join(multifile_content.path, 'subdir'))
+    torrent.path = os.pardir
+    assert torrent.path == Path(os.pardir)
+    assert torrent.metainfo['info']['name'] == os.path.basename(multifile_content.path)
+    assert torrent.metainfo['info']['files'] == multifile_content.exp_metainfo['info']['files']
 
 def test_path_ends_with_period(create_torrent, multifile_content):
     torrent = create_torrent()
@@ -196,7 +199,7 @@ def test_files_with_no_name(create_torrent, singlefile_content, multifile_conten
 def test_files_only_accepts_Iterables(create_torrent, tmp_path):
     (tmp_path / 'foo').write_text('asdf')
     torrent = create_torrent(path=tmp_path / 'foo')
-    torrent.generate()
+    _generate(torrent)
 
     assert torrent.metainfo['info']['name'] == 'foo'
     assert torrent.metainfo['info']['length'] == 4
@@ -213,7 +216,7 @@ def test_files_only_accepts_Iterables(create_torrent, tmp_path):
 def test_files_only_accepts_File_objects(create_torrent, tmp_path):
     (tmp_path / 'foo').write_text('asdf')
     torrent = create_torrent(path=tmp_path / 'foo')
-    torrent.generate()
+    _generate(torrent)
     with pytest.raises(ValueError) as excinfo:
         torrent.files = ('foo/bar',)
     assert str(excinfo.value) == 'Not a File object: foo/bar'
@@ -227,7 +230,7 @@ def test_files_only_accepts_File_objects(create_torrent, tmp_path):
 def test_files_only_accepts_relative_paths(create_torrent, tmp_path):
     (tmp_path / 'foo').write_text('asdf')
     torrent = create_torrent(path=tmp_path / 'foo')
-    torrent.generate()
+    _generate(torrent)
     with pytest.raises(torf.PathError) as excinfo:
         torrent.files = (torf.File('/1/2/3', size=123),)
     assert str(excinfo.value) == '/1/2/3: Not a relative path'
@@ -238,11 +241,10 @@ def test_files_only_accepts_relative_paths(create_torrent, tmp_path):
     assert 'pieces' in torrent.metainfo['info']
     assert torrent.files == (torf.File(Path('foo'), size=4),)
 
-def test_files_needs_common_path(create_torrent, tmp_path):
-    content = tmp_path / 'asdf' ; content.mkdir()  # noqa: E702
-    for i in range(1, 3): (content / f'file{i}').write_text('<data>')  # noqa: E701
+def test_files_needs_common_path(create_torrent, create_dir):
+    content = create_dir('asdf', *((f'file{i}', '<data>') for i in range(1, 3)))
     torrent = create_torrent(path=content)
-    torrent.generate()
+    _generate(torrent)
     with pytest.raises(torf.CommonPathError) as excinfo:
         torrent.files = (torf.File(Path('foo/bar/baz'), size=123),
                          torf.File(Path('quux/bar/bam'), size=456),)
@@ -255,11 +257,10 @@ def test_files_needs_common_path(create_torrent, tmp_path):
     assert 'pieces' in torrent.metainfo['info']
     assert 'length' not in torrent.metainfo['info']
 
-def test_files_updates_metainfo_when_manipulated(create_torrent, tmp_path):
-    content = tmp_path / 'bar' ; content.mkdir()  # noqa: E702
-    for i in range(1, 3): (content / f'file{i}').write_text('<data>')  # noqa: E701
+def test_files_updates_metainfo_when_manipulated(create_torrent, create_dir):
+    content = create_dir('bar', *((f'file{i}', '<data>') for i in range(1, 3)))
     torrent = create_torrent(path=content)
-    torrent.generate()
+    _generate(torrent)
     assert torrent.metainfo['info']['name'] == 'bar'
     assert 'pieces' in torrent.metainfo['info']
     assert 'length' not in torrent.metainfo['info']
@@ -280,7 +281,7 @@ def test_files_updates_metainfo_when_manipulated(create_torrent, tmp_path):
 def test_files_switch_from_singlefile_to_multifile(create_torrent, tmp_path):
     (tmp_path / 'foo').write_text('asdf')
     torrent = create_torrent(path=tmp_path / 'foo')
-    torrent.generate()
+    _generate(torrent)
     assert torrent.metainfo['info']['length'] == 4
     assert torrent.metainfo['info']['name'] == 'foo'
     assert 'pieces' in torrent.metainfo['info']
@@ -296,12 +297,10 @@ def test_files_switch_from_singlefile_to_multifile(create_torrent, tmp_path):
     assert torrent.files == (torf.File(Path('bar', 'file1'), size=123),
                              torf.File(Path('bar', 'file2'), size=456))
 
-def test_files_switch_from_multifile_to_singlefile(create_torrent, tmp_path):
-    (tmp_path / 'bar').mkdir()
-    for i in range(1, 3):
-        (tmp_path / 'bar' / f'file{i}').write_text('<data>')
+def test_files_switch_from_multifile_to_singlefile(create_torrent, create_dir, tmp_path):
+    create_dir('bar', *((f'file{i}', '<data>') for i in range(1, 3)))
     torrent = create_torrent(path=tmp_path / 'bar')
-    torrent.generate()
+    _generate(torrent)
     assert torrent.metainfo['info']['name'] == 'bar'
     assert torrent.metainfo['info']['files'] == [{'path': ['file1'], 'length': 6},
                                                  {'path': ['file2'], 'length': 6}]
@@ -334,10 +333,10 @@ def test_filepaths_multifile(create_torrent, multifile_content):
     assert torrent.filepaths == exp_filepaths1
     assert torrent.filepaths == exp_filepaths2
 
-def test_filepaths_is_set_to_empty_tuple(create_torrent, multifile_content, singlefile_content):
-    for content in (singlefile_content, multifile_content):
-        torrent = create_torrent(path=content.path)
-        torrent.generate()
+def test_filepaths_is_set_to_empty_tuple(generated_singlefile_torrent, generated_multifile_torrent,
+                                         singlefile_content, multifile_content):
+    for torrent, content in ((generated_singlefile_torrent, singlefile_content),
+                             (generated_multifile_torrent, multifile_content)):
         assert 'name' in torrent.metainfo['info']
         assert 'pieces' in torrent.metainfo['info']
         if content is singlefile_content:
@@ -448,10 +447,8 @@ def test_filepaths_with_single_file_manipulated_into_multifile(create_torrent, t
                                                  {'path': ['file2'], 'length': 3}]
     assert 'length' not in  torrent.metainfo['info']
 
-def test_filepaths_updates_metainfo_automatically_when_manipulated(create_torrent, tmp_path):
-    (tmp_path / 'content').mkdir()
-    for i in range(1, 5):
-        (tmp_path / 'content' / f'file{i}').write_text('<data>')
+def test_filepaths_updates_metainfo_automatically_when_manipulated(create_torrent, create_dir, tmp_path):
+    create_dir('content', *((f'file{i}', '<data>') for i in range(1, 5)))
     torrent = create_torrent(path=tmp_path / 'content')
 
     assert torrent.metainfo['info']['files'] == [{'path': ['file1'], 'length': 6},
@@ -472,10 +469,8 @@ def test_filepaths_updates_metainfo_automatically_when_manipulated(create_torren
                                                  {'path': ['file3'], 'length': 6},
                                                  {'path': ['file4'], 'length': 6}]
 
-def test_filepaths_gets_information_from_metainfo(create_torrent, tmp_path):
-    (tmp_path / 'content').mkdir()
-    for i in range(1, 5):
-        (tmp_path / 'content' / f'file{i}').write_text('<data>')
+def test_filepaths_gets_information_from_metainfo(create_torrent, create_dir, tmp_path):
+    create_dir('content', *((f'file{i}', '<data>') for i in range(1, 5)))
     torrent = create_torrent(path=tmp_path / 'content')
     torrent.metainfo['info']['files'].remove({'path': ['file1'], 'length': 6})
     torrent.metainfo['info']['files'].remove({'path': ['file2'], 'length': 6})
@@ -488,13 +483,10 @@ def test_filepaths_gets_information_from_metainfo(create_torrent, tmp_path):
     assert str(excinfo.value) == f'{tmp_path / "content" / "file9"}: No such file or directory'
 
 
-def test_filepaths_uses_common_parent_directory(create_torrent, tmp_path):
-    (tmp_path / 'content').mkdir()
-    for i in range(1, 4):
-        (tmp_path / 'content' / f'file{i}').write_text('<data>')
-    (tmp_path / 'content' / 'subdir').mkdir()
-    for i in range(4, 6):
-        (tmp_path / 'content' / 'subdir' / f'file{i}').write_text('<more data>')
+def test_filepaths_uses_common_parent_directory(create_torrent, create_dir, tmp_path):
+    create_dir('content',
+               *((f'file{i}', '<data>') for i in range(1, 4)),
+               *((f'subdir/file{i}', '<more data>') for i in range(4, 6)))
     torrent = create_torrent(path=tmp_path / 'content' / 'subdir')
     assert torrent.metainfo['info']['name'] == 'subdir'
     assert torrent.metainfo['info']['files'] == [{'path': ['file4'], 'length': 11},
@@ -506,17 +498,8 @@ def test_filepaths_uses_common_parent_directory(create_torrent, tmp_path):
                                                  {'path': ['subdir', 'file4'], 'length': 11},
                                                  {'path': ['subdir', 'file5'], 'length': 11}]
 
-def test_filepaths_resolves_directories(create_torrent, tmp_path):
-    (tmp_path / 'content').mkdir()
-    for i in range(1, 3):
-        (tmp_path / 'content' / f'file{i}').write_text('<data>')
-    (tmp_path / 'content' / 'subdir').mkdir()
-    for i in range(3, 5):
-        (tmp_path / 'content' / 'subdir' / f'file{i}').write_text('<subdata>')
-    (tmp_path / 'content' / 'subdir' / 'subsubdir').mkdir()
-    for i in range(5, 7):
-        (tmp_path / 'content' / 'subdir' / 'subsubdir' / f'file{i}').write_text('<subsubdata>')
-    torrent = create_torrent(path=tmp_path / 'content')
+def test_filepaths_resolves_directories(create_torrent, subdir_content):
+    torrent = create_torrent(path=subdir_content)
     assert torrent.metainfo['info']['name'] == 'content'
     assert torrent.metainfo['info']['files'] == [{'path': ['file1'], 'length': 6},
                                                  {'path': ['file2'], 'length': 6},
@@ -524,54 +507,46 @@ def test_filepaths_resolves_directories(create_torrent, tmp_path):
                                                  {'path': ['subdir', 'file4'], 'length': 9},
                                                  {'path': ['subdir', 'subsubdir', 'file5'], 'length': 12},
                                                  {'path': ['subdir', 'subsubdir', 'file6'], 'length': 12}]
-    torrent.filepaths = (tmp_path / 'content' / 'subdir' / 'subsubdir',)
+    torrent.filepaths = (subdir_content / 'subdir' / 'subsubdir',)
     assert torrent.metainfo['info']['name'] == 'subsubdir'
     assert torrent.metainfo['info']['files'] == [{'path': ['file5'], 'length': 12},
                                                  {'path': ['file6'], 'length': 12}]
-    torrent.filepaths = (tmp_path / 'content' / 'subdir',)
+    torrent.filepaths = (subdir_content / 'subdir',)
     assert torrent.metainfo['info']['name'] == 'subdir'
     assert torrent.metainfo['info']['files'] == [{'path': ['file3'], 'length': 9},
                                                  {'path': ['file4'], 'length': 9},
                                                  {'path': ['subsubdir', 'file5'], 'length': 12},
                                                  {'path': ['subsubdir', 'file6'], 'length': 12}]
 
-def test_filepaths_understands_relative_paths(create_torrent, tmp_path):
-    (tmp_path / 'parent' / 'content').mkdir(parents=True)
-    for i in range(1, 4):
-        (tmp_path / 'parent' / 'content' / f'file{i}').write_text('<data>')
-    cwd = os.getcwd()
-    try:
-        os.chdir(tmp_path)
-        abspath = tmp_path / 'parent' / 'content'
-        relpath = Path('parent', 'content')
-        torrent = create_torrent(path=relpath)
-        # File paths are relative
-        assert torrent.filepaths == [relpath / 'file1', relpath / 'file2', relpath / 'file3']
-        assert torrent.name == 'content'
-
-        # Remove file3 as absolute path
-        torrent.filepaths.remove(abspath / 'file3')
-        assert torrent.filepaths == [relpath / 'file1', relpath / 'file2']
-        assert torrent.name == 'content'
-
-        # Append file3 as absolute path
-        torrent.filepaths.append(abspath / 'file3')
-        assert torrent.filepaths == [relpath / 'file1', relpath / 'file2', abspath / 'file3']
-        assert torrent.name == 'content'
-
-        # Add file outside of torrent.path as relative path
-        (tmp_path / 'parent' / 'outsider').write_text('<data>')
-        torrent.filepaths.append(tmp_path / 'parent' / 'outsider')
-        assert torrent.name == 'parent'
-        assert torrent.filepaths == [relpath / 'file1', relpath / 'file2', abspath / 'file3',
-                                     Path('parent', 'outsider')]
-    finally:
-        os.chdir(cwd)
-
-def test_filepaths_does_not_accept_nonexisting_files(create_torrent, tmp_path):
-    (tmp_path / 'content').mkdir()
-    for i in range(1, 5):
-        (tmp_path / 'content' / f'file{i}').write_text('<data>')
+def test_filepaths_understands_relative_paths(create_torrent, create_dir, tmp_path, monkeypatch):
+    create_dir('parent', *((f'content/file{i}', '<data>') for i in range(1, 4)))
+    monkeypatch.chdir(tmp_path)
+    abspath = tmp_path / 'parent' / 'content'
+    relpath = Path('parent', 'content')
+    torrent = create_torrent(path=relpath)
+    # File paths are relative
+    assert torrent.filepaths == [relpath / 'file1', relpath / 'file2', relpath / 'file3']
+    assert torrent.name == 'content'
+
+    # Remove file3 as absolute path
+    torrent.filepaths.remove(abspath / 'file3')
+    assert torrent.filepaths == [relpath / 'file1', relpath / 'file2']
+    assert torrent.name == 'content'
+
+    # Append file3 as absolute path
+    torrent.filepaths.append(abspath / 'file3')
+    assert torrent.filepaths == [relpath / 'file1', relpath / 'file2', abspath / 'file3']
+    assert torrent.name == 'content'
+
+    # Add file outside of torrent.path as relative path
+    (tmp_path / 'parent' / 'outsider').write_text('<data>')
+    torrent.filepaths.append(tmp_path / 'parent' / 'outsider')
+    assert torrent.name == 'parent'
+    assert torrent.filepaths == [relpath / 'file1', relpath / 'file2', abspath / 'file3',
+                                 Path('parent', 'outsider')]
+
+def test_filepaths_does_not_accept_nonexisting_files(create_torrent, create_dir, tmp_path):
+    create_dir('content', *((f'file{i}', '<data>') for i in range(1, 5)))
     torrent = create_torrent(path=tmp_path / 'content')
 
     with pytest.raises(torf.ReadError) as excinfo:
@@ -598,25 +573,17 @@ def test_filetree_with_no_path(create_torrent):
     torrent = create_torrent()
     assert torrent.filetree == {}
 
-def test_filetree_with_subdirectories(create_torrent, tmp_path):
-    (tmp_path / 'content').mkdir()
-    for i in range(1, 3):
-        (tmp_path / 'content' / f'file{i}').write_text('<data>')
-    (tmp_path / 'content' / 'subdir').mkdir()
-    for i in range(3, 5):
-        (tmp_path / 'content' / 'subdir' / f'file{i}').write_text('<subdata>')
-    (tmp_path / 'content' / 'subdir' / 'subsubdir').mkdir()
-    for i in range(5, 7):
-        (tmp_path / 'content' / 'subdir' / 'subsubdir' / f'file{i}').write_text('<subsubdata>')
-    torrent = create_torrent(path=tmp_path / 'content')
-    File = torf.File
-    assert torrent.filetree == {'content': {
-        'file1': File(Path('content', 'file1'), size=6),
-        'file2': File(Path('content', 'file2'), size=6),
-        'subdir': {'file3': File(Path('content', 'subdir', 'file3'), size=9),
-                   'file4': File(Path('content', 'subdir', 'file4'), size=9),
-                   'subsubdir': {'file5': File(Path('content/subdir/subsubdir/file5'), size=12),
-                                 'file6': File(Path('content/subdir/subsubdir/file6'), size=12)}}}}
+_subdir_content_filetree = {'content': {
+    'file1': torf.File(Path('content', 'file1'), size=6),
+    'file2': torf.File(Path('content', 'file2'), size=6),
+    'subdir': {'file3': torf.File(Path('content', 'subdir', 'file3'), size=9),
+               'file4': torf.File(Path('content', 'subdir', 'file4'), size=9),
+               'subsubdir': {'file5': torf.File(Path('content/subdir/subsubdir/file5'), size=12),
+                             'file6': torf.File(Path('content/subdir/subsubdir/file6'), size=12)}}}}
+
+def test_filetree_with_subdirectories(create_torrent, subdir_content):
+    torrent = create_torrent(path=subdir_content)
+    assert torrent.filetree == _subdir_content_filetree
 
 def test_filetree_with_single_file_in_directory(create_torrent, tmp_path):
     (tmp_path / 'content').mkdir()
@@ -632,60 +599,63 @@ def test_filetree_with_single_file(create_torrent, tmp_path):
     assert torrent.filetree == {'content': File(Path('content'), size=6)}
 
 
+def _walk_files(root):
+    """Yield path and size of each file beneath `root`"""
+    dirpaths = [root]
+    while dirpaths:
+        with os.scandir(dirpaths.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dirpaths.append(entry.path)
+                elif entry.is_file():
+                    yield Path(entry.path), entry.stat().st_size
+
 def test_name(create_torrent, singlefile_content, multifile_content):
+    # Find files and their sizes only once
+    multifile_files = tuple((path.relative_to(multifile_content.path), size)
+                            for path, size in sorted(_walk_files(multifile_content.path)))
+    multifile_filepaths = tuple(Path(multifile_content.path, relpath) for relpath, _ in multifile_files)
+
     def generate_exp_files(content, torrent_name):
         if content is singlefile_content:
             return (Path(torrent_name),)
         else:
-            filewalker = (Path(f) for f in glob.iglob(os.path.join(content.path, '**'), recursive=True)
-                          if os.path.isfile(f))
-            rel_paths = sorted(path.relative_to(content.path) for path in filewalker)
-            exp_files = tuple(torf.File(Path(torrent_name, path),
-                                        size=os.path.getsize(Path(content.path, path)))
-                              for path in rel_paths)
-            return exp_files
+            return tuple(torf.File(Path(torrent_name, relpath), size=size)
+                         for relpath, size in multifile_files)
 
     def generate_exp_filepaths(content):
         if content is singlefile_content:
             return (Path(content.path),)
         else:
-            return tuple(sorted(Path(f) for f in glob.iglob(os.path.join(content.path, '**'), recursive=True)
-                                if os.path.isfile(f)))
+            return multifile_filepaths
+
+    def assert_files(content, exp_name, exp_filepaths):
+        assert torrent.name == exp_name
+        assert torrent.files == generate_exp_files(content, exp_name)
+        assert torrent.filepaths == exp_filepaths
+        for fp in torrent.filepaths:
+            assert os.path.exists(fp)
 
     torrent = create_torrent()
     for content in (singlefile_content, multifile_content):
+        content_name = os.path.basename(content.path)
+        exp_filepaths = generate_exp_filepaths(content)
         torrent.name = None
 
         torrent.path = content.path
-        assert torrent.name == os.path.basename(torrent.path)
-        assert torrent.files == generate_exp_files(content, os.path.basename(content.path))
-        assert torrent.filepaths == generate_exp_filepaths(content)
-        for fp in torrent.filepaths:
-            assert os.path.exists(fp)
+        assert_files(content, content_name, exp_filepaths)
 
         torrent.name = 'Any name should be allowed'
-        assert torrent.name == 'Any name should be allowed'
-        assert torrent.files == generate_exp_files(content, 'Any name should be allowed')
-        assert torrent.filepaths == generate_exp_filepaths(content)
-        for fp in torrent.filepaths:
-            assert os.path.exists(fp)
+        assert_files(content, 'Any name should be allowed', exp_filepaths)
 
         torrent.path = None
-        assert torrent.name == 'Any name should be allowed'
-        assert torrent.files == generate_exp_files(content, 'Any name should be allowed')
-        assert torrent.filepaths == ()
+        assert_files(content, 'Any name should be allowed', ())
 
         torrent.name = 'foo'
-        assert torrent.name == 'foo'
-        assert torrent.files == generate_exp_files(content, 'foo')
-        assert torrent.filepaths == ()
+        assert_files(content, 'foo', ())
 
         torrent.path = content.path
-        assert torrent.name == os.path.basename(torrent.path)
-        assert torrent.files == generate_exp_files(content, os.path.basename(torrent.path))
-        assert torrent.filepaths == generate_exp_filepaths(content)
-        for fp in torrent.filepaths:
-            assert os.path.exists(fp)
+        assert_files(content, content_name, exp_filepaths)
 
 
 def test_size(create_torrent, singlefile_content, multifile_content):
@@ -975,6 +945,41 @@ def test_piece_size_min_max_attributes(old_piece_size, new_piece_size, piece_siz
     assert torrent.piece_size_max == exp_piece_size_max
 
 
+# Content sizes and their expected piece sizes without any constraints
+_calculate_piece_size_content_sizes = (
+    (   1, 16 * 2**10),  # 1 piece # noqa:E201
+    (  10, 16 * 2**10),  # 1 piece # noqa:E201
+    ( 100, 16 * 2**10),  # 1 piece # noqa:E201
+    (1000, 16 * 2**10),  # 1 piece # noqa:E201
+
+    (   1 * 2**10,  16 * 2**10),  # 1 piece # noqa:E201
+    (  10 * 2**10,  16 * 2**10),  # 1 piece # noqa:E201
+    ( 100 * 2**10,  16 * 2**10),  # 7 pieces # noqa:E201
+    ( 300 * 2**10,  16 * 2**10),  # 19 pieces # noqa:E201
+    ( 600 * 2**10,  16 * 2**10),  # 38 pieces # noqa:E201
+    (1000 * 2**10,  16 * 2**10),  # 63 pieces # noqa:E201
+
+    (   1 * 2**20,  16 * 2**10),  # 64 pieces # noqa:E201
+    (   3 * 2**20,  16 * 2**10),  # 192 pieces # noqa:E201
+    (   6 * 2**20,  16 * 2**10),  # 384 pieces # noqa:E201
+    (  10 * 2**20,  32 * 2**10),  # 320 pieces # noqa:E201
+    (  30 * 2**20,  64 * 2**10),  # 480 pieces # noqa: E201
+    (  60 * 2**20, 128 * 2**10),  # 480 pieces # noqa:E201
+    ( 100 * 2**20, 256 * 2**10),  # 400 pieces # noqa:E201
+    ( 300 * 2**20,   1 * 2**20),  # 300 pieces # noqa:E201
+    ( 600 * 2**20,   2 * 2**20),  # 300 pieces # noqa:E201
+    (1000 * 2**20,   2 * 2**20),  # 500 pieces # noqa:E201
+
+    (   1 * 2**30,   2 * 2**20),  # 512 pieces # noqa:E201
+    (   3 * 2**30,   4 * 2**20),  # 768 pieces # noqa:E201
+    (   6 * 2**30,   8 * 2**20),  # 1536 pieces # noqa:E201
+    (  10 * 2**30,   8 * 2**20),  # 1200 pieces # noqa:E201
+    (  30 * 2**30,  16 * 2**20),  # 1920 pieces # noqa:E201
+    (  60 * 2**30,  32 * 2**20),  # 1920 pieces # noqa:E201
+    ( 100 * 2**30,  64 * 2**20),  # 1600 pieces # noqa:E201
+    (1000 * 2**30, 512 * 2**20),  # 2000 pieces # noqa:E201
+)
+
 @pytest.mark.parametrize(
     argnames='kwargs, cls_attrs, exp_min_piece_size, exp_max_piece_size',
     argvalues=(
@@ -1093,63 +1098,22 @@ def test_piece_size_min_max_attributes(old_piece_size, new_piece_size, piece_siz
     ),
     ids=lambda v: repr(v),
 )
-@pytest.mark.parametrize(
-    argnames='content_size, exp_unconstrained_piece_size',
-    argvalues=(
-        (   1, 16 * 2**10),  # 1 piece # noqa:E201
-        (  10, 16 * 2**10),  # 1 piece # noqa:E201
-        ( 100, 16 * 2**10),  # 1 piece # noqa:E201
-        (1000, 16 * 2**10),  # 1 piece # noqa:E201
-
-        (   1 * 2**10,  16 * 2**10),  # 1 piece # noqa:E201
-        (  10 * 2**10,  16 * 2**10),  # 1 piece # noqa:E201
-        ( 100 * 2**10,  16 * 2**10),  # 7 pieces # noqa:E201
-        ( 300 * 2**10,  16 * 2**10),  # 19 pieces # noqa:E201
-        ( 600 * 2**10,  16 * 2**10),  # 38 pieces # noqa:E201
-        (1000 * 2**10,  16 * 2**10),  # 63 pieces # noqa:E201
-
-        (   1 * 2**20,  16 * 2**10),  # 64 pieces # noqa:E201
-        (   3 * 2**20,  16 * 2**10),  # 192 pieces # noqa:E201
-        (   6 * 2**20,  16 * 2**10),  # 384 pieces # noqa:E201
-        (  10 * 2**20,  32 * 2**10),  # 320 pieces # noqa:E201
-        (  30 * 2**20,  64 * 2**10),  # 480 pieces # noqa: E201
-        (  60 * 2**20, 128 * 2**10),  # 480 pieces # noqa:E201
-        ( 100 * 2**20, 256 * 2**10),  # 400 pieces # noqa:E201
-        ( 300 * 2**20,   1 * 2**20),  # 300 pieces # noqa:E201
-        ( 600 * 2**20,   2 * 2**20),  # 300 pieces # noqa:E201
-        (1000 * 2**20,   2 * 2**20),  # 500 pieces # noqa:E201
-
-        (   1 * 2**30,   2 * 2**20),  # 512 pieces # noqa:E201
-        (   3 * 2**30,   4 * 2**20),  # 768 pieces # noqa:E201
-        (   6 * 2**30,   8 * 2**20),  # 1536 pieces # noqa:E201
-        (  10 * 2**30,   8 * 2**20),  # 1200 pieces # noqa:E201
-        (  30 * 2**30,  16 * 2**20),  # 1920 pieces # noqa:E201
-        (  60 * 2**30,  32 * 2**20),  # 1920 pieces # noqa:E201
-        ( 100 * 2**30,  64 * 2**20),  # 1600 pieces # noqa:E201
-        (1000 * 2**30, 512 * 2**20),  # 2000 pieces # noqa:E201
-    ),
-    ids=lambda v: repr(v),
-)
-def test_calculate_piece_size(
-        kwargs, cls_attrs, exp_min_piece_size, exp_max_piece_size,
-        content_size, exp_unconstrained_piece_size,
-        monkeypatch,
-):
+def test_calculate_piece_size(kwargs, cls_attrs, exp_min_piece_size, exp_max_piece_size, monkeypatch):
     for name, value in cls_attrs.items():
         monkeypatch.setattr(torf.Torrent, name, value)
 
-    exp_piece_size = max(
-        min(
-            exp_unconstrained_piece_size,
-            exp_max_piece_size,
-        ),
-        exp_min_piece_size
-    )
-    print('exp piece size:', exp_piece_size)
-
-    piece_size = torf.Torrent.calculate_piece_size(content_size, **kwargs)
-    print('piece count:', math.ceil(content_size / piece_size))
-    assert piece_size == exp_piece_size
+    for content_size, exp_unconstrained_piece_size in _calculate_piece_size_content_sizes:
+        exp_piece_size = max(
+            min(
+                exp_unconstrained_piece_size,
+                exp_max_piece_size,
+            ),
+            exp_min_piece_size
+        )
+        piece_size = torf.Torrent.calculate_piece_size(content_size, **kwargs)
+        assert piece_size == exp_piece_size, (
+            f'content_size={content_size!r}, piece count: {math.ceil(content_size / piece_size)}'
+        )
 
 
 # "piece_size_" because "piece_size" is already used for --piece-size
@@ -1181,7 +1145,7 @@ def test_hashes(create_torrent, multifile_content):
     torrent.path = multifile_content.path
     torrent.piece_size = multifile_content.exp_metainfo['info']['piece length']
     assert torrent.hashes == ()
-    torrent.generate()
+    _generate(torrent)
     hashes_string = multifile_content.exp_metainfo['info']['pieces']
     assert torrent.hashes == tuple(hashes_string[pos : pos + 20]
                                    for pos in range(0, len(hashes_string), 20))
@@ -1313,22 +1277,50 @@ def test_trackers__addition(create_torrent):
     assert torrent.metainfo['announce'] == 'http://foo'
 
 
-def test_webseeds__correct_type(create_torrent):
+_webseeds_and_httpseeds = pytest.mark.parametrize(
+    argnames='attr, key',
+    argvalues=(
+        ('webseeds', 'url-list'),
+        ('httpseeds', 'httpseeds'),
+    ),
+    ids=lambda v: repr(v),
+)
+
+@_webseeds_and_httpseeds
+def test_seeds__correct_type(attr, key, create_torrent):
     torrent = create_torrent()
     for value in ((), 'http://foo', ['http://foo', 'http://bar'], None):
-        torrent.webseeds = value
-        assert isinstance(torrent.webseeds, utils.URLs)
+        setattr(torrent, attr, value)
+        assert isinstance(getattr(torrent, attr), utils.URLs)
+
+@_webseeds_and_httpseeds
+def test_seeds__sync_to_metainfo(attr, key, create_torrent):
+    torrent = create_torrent(**{attr: ()})
+    assert getattr(torrent, attr) == []
+    assert key not in torrent.metainfo
+    setattr(torrent, attr, ['http://foo'])
+    assert getattr(torrent, attr) == ['http://foo']
+    assert torrent.metainfo[key] == ['http://foo']
+    getattr(torrent, attr).clear()
+    assert getattr(torrent, attr) == []
+    assert key not in torrent.metainfo
+
+@_webseeds_and_httpseeds
+def test_seeds__setting_to_invalid_type(attr, key, create_torrent):
+    torrent = create_torrent()
+    with pytest.raises(ValueError) as e:
+        setattr(torrent, attr, 23)
+    assert str(e.value) == 'Must be Iterable, str or None, not int: 23'
 
-def test_webseeds__sync_to_metainfo(create_torrent):
-    torrent = create_torrent(webseeds=())
-    assert torrent.webseeds == []
-    assert 'url-list' not in torrent.metainfo
-    torrent.webseeds = ['http://foo']
-    assert torrent.webseeds == ['http://foo']
-    assert torrent.metainfo['url-list'] == ['http://foo']
-    torrent.webseeds.clear()
-    assert torrent.webseeds == []
-    assert 'url-list' not in torrent.metainfo
+@_webseeds_and_httpseeds
+def test_seeds__addition(attr, key, create_torrent):
+    torrent = create_torrent()
+    setattr(torrent, attr, ['http://foo'])
+    # Same as `torrent.webseeds += [...]`
+    urls = getattr(torrent, attr)
+    urls += ['http://bar']
+    setattr(torrent, attr, urls)
+    assert getattr(torrent, attr) == ['http://foo', 'http://bar']
 
 def test_webseeds__sync_from_metainfo(create_torrent):
     torrent = create_torrent(webseeds=())
@@ -1348,36 +1340,6 @@ def test_webseeds__urls_are_validated(create_torrent):
         torrent.webseeds = ['http://foo', 'http://foo:bar']
     assert str(e.value) == 'http://foo:bar: Invalid URL'
 
-def test_webseeds__setting_to_invalid_type(create_torrent):
-    torrent = create_torrent()
-    with pytest.raises(ValueError) as e:
-        torrent.webseeds = 23
-    assert str(e.value) == 'Must be Iterable, str or None, not int: 23'
-
-def test_webseeds__addition(create_torrent):
-    torrent = create_torrent()
-    torrent.webseeds = ['http://foo']
-    torrent.webseeds += ['http://bar']
-    assert torrent.webseeds == ['http://foo', 'http://bar']
-
-
-def test_httpseeds__correct_type(create_torrent):
-    torrent = create_torrent()
-    for value in ((), 'http://foo', ['http://foo', 'http://bar'], None):
-        torrent.httpseeds = value
-        assert isinstance(torrent.httpseeds, utils.URLs)
-
-def test_httpseeds__sync_to_metainfo(create_torrent):
-    torrent = create_torrent(httpseeds=())
-    assert torrent.httpseeds == []
-    assert 'httpseeds' not in torrent.metainfo
-    torrent.httpseeds = ['http://foo']
-    assert torrent.httpseeds == ['http://foo']
-    assert torrent.metainfo['httpseeds'] == ['http://foo']
-    torrent.httpseeds.clear()
-    assert torrent.httpseeds == []
-    assert 'httpseeds' not in torrent.metainfo
-
 def test_httpseeds__sync_from_metainfo(create_torrent):
     torrent = create_torrent(httpseeds=())
     torrent.metainfo['httpseeds'] = ['http://foo']
@@ -1393,39 +1355,25 @@ def test_httpseeds__urls_are_validated(create_torrent):
         torrent.httpseeds = ['http://foo', 'http://foo:bar']
     assert str(e.value) == 'http://foo:bar: Invalid URL'
 
-def test_httpseeds__setting_to_invalid_type(create_torrent):
-    torrent = create_torrent()
-    with pytest.raises(ValueError) as e:
-        torrent.httpseeds = 23
-    assert str(e.value) == 'Must be Iterable, str or None, not int: 23'
-
-def test_httpseeds__addition(create_torrent):
-    torrent = create_torrent()
-    torrent.httpseeds = ['http://foo']
-    torrent.httpseeds += ['http://bar']
-    assert torrent.httpseeds == ['http://foo', 'http://bar']
-
 
 def test_leaving_private_unset_does_not_include_it_in_metainfo(create_torrent):
     torrent = create_torrent()
     assert torrent.private is None
     assert 'private' not in torrent.metainfo['info']
 
-def test_setting_private_always_includes_it_in_metainfo(create_torrent):
-    torrent = create_torrent()
-    for private in (True, False):
-        torrent = create_torrent(private=private)
-        assert torrent.private is private
-        assert 'private' in torrent.metainfo['info']
-
-def test_setting_private_to_None_removes_it_from_metainfo(create_torrent):
-    torrent = create_torrent()
-    for private in (True, False):
-        torrent = create_torrent(private=private)
-        assert torrent.private is private
-        torrent.private = None
-        assert torrent.private is None
-        assert 'private' not in torrent.metainfo['info']
+@pytest.mark.parametrize('private', (True, False), ids=['true', 'false'])
+def test_setting_private_always_includes_it_in_metainfo(private, create_torrent):
+    torrent = create_torrent(private=private)
+    assert torrent.private is private
+    assert 'private' in torrent.metainfo['info']
+
+@pytest.mark.parametrize('private', (True, False), ids=['true', 'false'])
+def test_setting_private_to_None_removes_it_from_metainfo(private, create_torrent):
+    torrent = create_torrent(private=private)
+    assert torrent.private is private
+    torrent.private = None
+    assert torrent.private is None
+    assert 'private' not in torrent.metainfo['info']
 
 def test_setting_private_enforces_boolean_values(create_torrent):
     torrent = create_torrent()
@@ -1438,28 +1386,6 @@ def test_setting_private_enforces_boolean_values(create_torrent):
     assert torrent.metainfo['info']['private'] is False
 
 
-def test_comment(create_torrent):
-    torrent = create_torrent()
-    torrent.comment = ''
-    assert torrent.comment == ''
-    assert torrent.metainfo['comment'] == ''
-
-    torrent.comment = None
-    assert torrent.comment is None
-    assert 'comment' not in torrent.metainfo
-
-
-def test_source(create_torrent):
-    torrent = create_torrent()
-    torrent.source = ''
-    assert torrent.source == ''
-    assert torrent.metainfo['info']['source'] == ''
-
-    torrent.source = None
-    assert torrent.source is None
-    assert 'source' not in torrent.metainfo['info']
-
-
 @pytest.mark.parametrize(
     argnames='date, exp_date',
     argvalues=(
@@ -1468,35 +1394,57 @@ def test_source(create_torrent):
         (None, None),
         ('', None),
         (b'', None),
-        ([1, 2, 3], ValueError('Must be None, int or datetime object, not list: [1, 2, 3]')),
     ),
     ids=lambda v: repr(v),
 )
 def test_creation_date(date, exp_date, create_torrent):
     torrent = create_torrent()
-
-    if isinstance(exp_date, Exception):
-        with pytest.raises(type(exp_date), match=rf'^{re.escape(str(exp_date))}$'):
-            torrent.creation_date = date
-
+    torrent.creation_date = date
+    assert torrent.creation_date == exp_date
+    if torrent.creation_date is None:
+        assert 'creation date' not in torrent.metainfo
     else:
+        assert torrent.creation_date is torrent.metainfo['creation date']
+
+@pytest.mark.parametrize(
+    argnames='date, exp_error_regex',
+    argvalues=(
+        pytest.param(
+            [1, 2, 3],
+            rf'^{re.escape("Must be None, int or datetime object, not list: [1, 2, 3]")}$',
+            id='[1, 2, 3]',
+        ),
+    ),
+)
+def test_creation_date_invalid(date, exp_error_regex, create_torrent):
+    torrent = create_torrent()
+    with pytest.raises(ValueError, match=exp_error_regex):
         torrent.creation_date = date
-        assert torrent.creation_date == exp_date
-        if torrent.creation_date is None:
-            assert 'creation date' not in torrent.metainfo
-        else:
-            assert torrent.creation_date is torrent.metainfo['creation date']
 
 
-def test_created_by(create_torrent):
+@pytest.mark.parametrize(
+    argnames='attr, keys',
+    argvalues=(
+        pytest.param('comment', ('comment',), id='comment'),
+        pytest.param('created_by', ('created by',), id='created_by'),
+        pytest.param('source', ('info', 'source'), id='source'),
+    ),
+)
+def test_string_attributes(attr, keys, create_torrent):
     torrent = create_torrent()
-    torrent.created_by = 'somebody'
-    assert torrent.created_by == 'somebody'
-    assert torrent.metainfo['created by'] == 'somebody'
+    *parent_keys, key = keys
+    metainfo = torrent.metainfo
+    for parent_key in parent_keys:
+        metainfo = metainfo[parent_key]
+
+    for value in ('', 'somebody'):
+        setattr(torrent, attr, value)
+        assert getattr(torrent, attr) == value
+        assert metainfo[key] == value
 
-    torrent.created_by = None
-    assert torrent.created_by is None
-    assert 'created by' not in torrent.metainfo
+    setattr(torrent, attr, None)
+    assert getattr(torrent, attr) is None
+    assert key not in metainfo
 
 
 def test_repr_string(singlefile_content):
@@ -1523,12 +1471,13 @@ def test_repr_string(singlefile_content):
     assert repr(t) == f"Torrent(comment='foo', source='foo', created_by='foo', piece_size={2**20})"
 
 
+_equality_kwargs = {'trackers': ('https://localhost/',),
+                    'comment': 'Foo',
+                    'created_by': 'Bar'}
+
 def test_equality(singlefile_content):
-    kwargs = {'trackers': ['https://localhost/'],
-              'comment': 'Foo',
-              'created_by': 'Bar'}
-    t1 = torf.Torrent(singlefile_content.path, **kwargs)
-    t2 = torf.Torrent(singlefile_content.path, **kwargs)
+    t1 = torf.Torrent(singlefile_content.path, **_equality_kwargs)
+    t2 = torf.Torrent(singlefile_content.path, **_equality_kwargs)
     assert t1 == t2
     t1.metainfo['foo'] = 'bar'
     assert t1 != t2
@@ -1545,36 +1494,30 @@ def test_equality(singlefile_content):
 
 
 def check_hash(content, hashname):
+    piece_length = content.exp_metainfo['info']['piece length']
+    exp_hash = getattr(content.exp_attrs, hashname)
     t = torf.Torrent(content.path, trackers=['http://localhost/'],
-                     piece_size=content.exp_metainfo['info']['piece length'])
-    assert t.piece_size == content.exp_metainfo['info']['piece length']
-    t.generate()
-    exp_attrs = content.exp_attrs
-    assert getattr(t, hashname) == getattr(exp_attrs, hashname)
+                     piece_size=piece_length)
+    assert t.piece_size == piece_length
+    _generate(t)
+    assert getattr(t, hashname) == exp_hash
 
     del t.metainfo['info']['piece length']
     with pytest.raises(torf.MetainfoError) as excinfo:
         getattr(t, hashname)
     assert str(excinfo.value) == "Invalid metainfo: Missing 'piece length' in ['info']"
 
-def test_infohash_singlefile(singlefile_content):
-    check_hash(singlefile_content, 'infohash')
-
-def test_infohash_base32_singlefile(singlefile_content):
-    check_hash(singlefile_content, 'infohash_base32')
-
-def test_infohash_multifile(multifile_content):
-    check_hash(multifile_content, 'infohash')
-
-def test_infohash_base32_multifile(multifile_content):
-    check_hash(multifile_content, 'infohash_base32')
+@pytest.mark.parametrize('content_fixture', ('singlefile_content', 'multifile_content'))
+@pytest.mark.parametrize('hashname', ('infohash', 'infohash_base32'))
+def test_infohash(content_fixture, hashname, request):
+    check_hash(request.getfixturevalue(content_fixture), hashname)
 
 
 def test_randomize_infohash(singlefile_content):
     t1 = torf.Torrent(singlefile_content.path)
     t2 = torf.Torrent(singlefile_content.path)
-    t1.generate()
-    t2.generate()
+    _generate(t1)
+    _generate(t2)
 
     t1.randomize_infohash = False
     t2.randomize_infohash = False
@@ -1596,41 +1539,41 @@ def test_copy_before_ready(singlefile_content):
 def test_copy_when_ready(singlefile_content):
     t1 = torf.Torrent(singlefile_content.path, comment='Asdf.',
                       randomize_infohash=True, webseeds=['http://foo'])
-    t1.generate()
+    _generate(t1)
     assert t1.is_ready
     t2 = t1.copy()
     assert t1 == t2
     assert t1 is not t2
 
-def test_copy_with_copy_module(singlefile_content):
-    t1 = torf.Torrent(singlefile_content.path, comment='Asdf.',
-                      randomize_infohash=True, webseeds=['http://foo'])
-    t1.generate()
-
-    t2 = copy.copy(t1)
-    assert t1 == t2
-    assert t1 is not t2
+@pytest.mark.parametrize('copier', (copy.copy, copy.deepcopy), ids=['copy', 'deepcopy'])
+def test_copy_with_copy_module(copier, generated_singlefile_torrent):
+    t1 = generated_singlefile_torrent
+    t1.comment = 'Asdf.'
+    t1.randomize_infohash = True
+    t1.webseeds = ['http://foo']
 
-    t2 = copy.deepcopy(t1)
+    t2 = copier(t1)
     assert t1 == t2
     assert t1 is not t2
 
 
-def test_Torrent_object_is_picklable(generated_multifile_torrent):
-    t1 = generated_multifile_torrent
+def test_Torrent_object_is_picklable(multifile_content):
+    t1 = torf.Torrent(
+        multifile_content.path,
+        trackers=['http://localhost:123'],
+        webseeds=['http://localhost:234'],
+        httpseeds=['http://localhost:345'],
+        private=True,
+        comment='Foo',
+        source='ASDF',
+        creation_date=123456,
+        created_by='ME!',
+        piece_size=1048576,
+        randomize_infohash=True,
+    )
+    # Removing the path also removes any 'pieces', so there is no need to
+    # generate the torrent first
     t1.path = None
-    t1.trackers = ['http://localhost:123']
-    t1.webseeds = ['http://localhost:234']
-    t1.httpseeds = ['http://localhost:345']
-    t1.private = True
-    t1.comment = 'Foo'
-    t1.source = 'ASDF'
-    t1.creation_date = 123456
-    t1.created_by = 'ME!'
-    t1.piece_size = 1048576
-    t1.randomize_infohash = True
-    t1_metainfo = copy.deepcopy(t1.metainfo.copy())
 
     t2 = pickle.loads(pickle.dumps(t1))
-    t2_metainfo = copy.deepcopy(t2.metainfo.copy())
-    assert t2_metainfo == t1_metainfo
+    assert t2.metainfo == t1.metainfo
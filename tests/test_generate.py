@@ -98,12 +98,13 @@ def test_metainfo_with_singlefile_torrent(create_file, random_seed):
     # $ mktorrent -l 15 /tmp/pytest-of-*/pytest-current/test_metainfo_with_singlefile_current/file.jpg
     # $ btcheck -i file.jpg.torrent -n | grep Hash
     # $ python3 -c "from flatbencode import decode; print(decode(open('file.jpg.torrent', 'rb').read())[b'info'][b'pieces'])"
-    exp_infohash = 'e7e02c57df57f30f5e66a69bfa210e9c61a5a8f6'
-    exp_pieces = (b"<\x9c7\x80\xa5\xf6-\xb7)\xd0A\x1d\xb5\x1b\xacw\x10\x91\x9c\xe8\xb4\x16"
-                  b"\x00bg\xbc`\xc5\xc2\xf86\x88\xb2~\xd6E\xeeZ\xb0d\xcd\x9ek(\xc746G\x17"
-                  b"\xab\xa6'/D\xba\xd9\xf0d\x81\xe3\xf5C\x82JQ\xde\xb5\x17w\xda\xbc\xb7Ek"
-                  b"\nHU\xcd\x1f\xd6C\xcb!\xb0CW\\\xc4\x8d\xad9\xbe\xb4V\x8a7\xdf\x9a\xabV"
-                  b"\xa6\xe5\xee3\x81\xe5I\xa7\xfe#\xcb\xea\xc3\x8e\xc4\x00\x91\xdb\x00\xaf")
+    exp_infohash = '28be327a7d7ebd1ff54a336680ac155a9c122250'
+    exp_pieces = (b'\xdc\xad\xc5O\x86Aup\x8e\x93>\xd6,\\Om\xaa\xf3\xb4v\xbbd'
+                  b"\x8f\xcb=\x9f\xd6\xe4\x1f\x81\xb0\xb2'1M\x94\x95\x02\xb1R\x15U\xe6\xb8"
+                  b'\x06C\x94\xdf\x17:\xf7\xfa\xe2\xf9\xc6\x92Vj\x17\xcd\xad\xd6\xce\x0c"\x1c'
+                  b'\xe1\xf0\xfd\x8e\x7fw\xcaN\xa1d\xd5p3\x086\xdf\x07hYP\x00\xe8'
+                  b'R/\x02d\x82\xb3\x10\\\xc9\x8a\x11U\x8d\xf6\xf9(x"\x1c\xdf\x16\x8e'
+                  b'\x8b\xf1\xa0\xbb\x96\x9b\xdf\xfar\xfb')
     _check_metainfo(content_path, 2**15, exp_infohash, exp_pieces)
 
 def test_metainfo_with_multifile_torrent(create_dir, random_seed):
@@ -116,11 +117,11 @@ def test_metainfo_with_multifile_torrent(create_dir, random_seed):
     # $ mktorrent -l 15 /tmp/pytest-of-*/pytest-current/test_metainfo_with_multifile_tcurrent/content/
     # $ btcheck -i content.torrent -n | grep Hash
     # $ python3 -c "from flatbencode import decode; print(decode(open('content.torrent', 'rb').read())[b'info'][b'pieces'])"
-    exp_infohash = 'b36eeca9231867ebf650ed82a54216617408d2ce'
-    exp_pieces = (b'\x84{\x9eM\x16\xa9\xe9\xf7V\xb8\xb3\xc2\xb8Q\xfaw\xea \xb9\xdc'
-                  b'\xf2\xc0\x0e\rXE\x85g\xe6k\x1dt\xa6\xca\x7f/\xb5)A"5!\xb9\xda\xe2'
-                  b'"\x15c^\x0e\xf7\x91|\x06V\xdc}\xd9\xb0<./\x0fBe\xcb\xd8*\xae\xd1"'
-                  b'\x05\n\x1b\xf3\x18\x1c\xd7u\xe3')
+    exp_infohash = '84c5290d88204d7e9bee1a2f4c4cda095fd3d10d'
+    exp_pieces = (b'\xd8\x05-"\xb4Y\xa0SO3\x86\xfdV\x0f\x93\xbf\xfa\xe6I\tq\xf3'
+                  b'\xe8=\xad\x1afS^\xd9}\xc4\xe6u\xf5\x13\xe3OnJ\x98\x92\xe3W'
+                  b':\xb0B;\x1bY\xa7\xc0\xc7?\xad]\xcd.=\x99\xc7\xf4\xf3%,\x8f'
+                  b'\x1e\x8c\x8f`J\xb6\x19\x1d\xa9\xca\xc4\xe6*\x1f')
     _check_metainfo(content_path, 2**15, exp_infohash, exp_pieces)
 
 def _check_metainfo(content_path, piece_size, exp_infohash, exp_pieces):
@@ -1,5 +1,6 @@
 import collections
 import errno
+import io
 import itertools
 import os
 import random
@@ -94,6 +95,18 @@ class _TestCaseBase():
         self.forced_piece_size = forced_piece_size
         self.reset()
 
+    # Content is always zeroed, so the generated torrent only depends on the
+    # file names and sizes and the piece size
+    _torrent_cache = {}
+
+    def create_torrent(self):
+        key = (type(self), self.filespecs, self.piece_size)
+        if key not in self._torrent_cache:
+            with self.forced_piece_size(self.piece_size):
+                with self.create_torrent_file(path=self.content_path) as torrent_filepath:
+                    self._torrent_cache[key] = torrent_filepath.read_bytes()
+        return torf.Torrent.read_stream(io.BytesIO(self._torrent_cache[key]))
+
     def reset(self):
         self.corruption_positions = set()
         self.files_corrupt = []
@@ -305,9 +318,7 @@ class _TestCaseSinglefile(_TestCaseBase):
         self.stream_original = b'\x00' * self.filesize
         self.stream_corrupt = bytearray(self.stream_original)
         self.content_path = self.create_file(self.filename, self.stream_original)
-        with self.forced_piece_size(piece_size):
-            with self.create_torrent_file(path=self.content_path) as torrent_filepath:
-                self.torrent = torf.Torrent.read(torrent_filepath)
+        self.torrent = self.create_torrent()
 
     def corrupt_stream(self, *positions):
         # Check if this file already has other errors
@@ -370,9 +381,7 @@ class _TestCaseMultifile(_TestCaseBase):
             create_dir_args.append((filename, data))
         self.content_path = self.create_dir('content', *create_dir_args)
         debug(f'Content: {self.content_original}')
-        with self.forced_piece_size(piece_size):
-            with self.create_torrent_file(path=self.content_path) as torrent_filepath:
-                self.torrent = torf.Torrent.read(torrent_filepath)
+        self.torrent = self.create_torrent()
 
     @property
     def stream_original(self):
@@ -579,21 +588,21 @@ def test_verify_multifile_torrent_with_file(generated_multifile_torrent, tmp_pat
 def test_verify_content_successfully(mktestcase, piece_size, callback, filespecs):
     display_filespecs(filespecs, piece_size)  # noqa: F405
     tc = mktestcase(filespecs, piece_size)
-    tc.run(with_callback=callback['enabled'],
+    tc.run(with_callback=callback,
            exp_return_value=True)
 
 def test_verify_content_with_random_corruptions_and_no_skipping(mktestcase, piece_size, callback, filespecs):
     display_filespecs(filespecs, piece_size)  # noqa: F405
     tc = mktestcase(filespecs, piece_size)
     tc.corrupt_stream()
-    tc.run(with_callback=callback['enabled'],
+    tc.run(with_callback=callback,
            exp_return_value=False)
 
 # def test_verify_content_with_random_corruptions_and_skipping(mktestcase, piece_size, callback, filespecs):
 #     display_filespecs(filespecs, piece_size)  # noqa: F405
 #     tc = mktestcase(filespecs, piece_size)
 #     tc.corrupt_stream()
-#     tc.run(with_callback=callback['enabled'],
+#     tc.run(with_callback=callback,
 #            skip_on_error=True,
 #            exp_return_value=False)
 
@@ -602,7 +611,7 @@ def test_verify_content_with_missing_files_and_no_skipping(mktestcase, piece_siz
     tc = mktestcase(filespecs, piece_size)
     for index in filespec_indexes:
         tc.delete_file(index)
-    tc.run(with_callback=callback['enabled'],
+    tc.run(with_callback=callback,
            exp_return_value=False)
 
 # def test_verify_content_with_missing_files_and_skipping(mktestcase, piece_size, callback, filespecs, filespec_indexes):
@@ -610,7 +619,7 @@ def test_verify_content_with_missing_files_and_no_skipping(mktestcase, piece_siz
 #     tc = mktestcase(filespecs, piece_size)
 #     for index in filespec_indexes:
 #         tc.delete_file(index)
-#     tc.run(with_callback=callback['enabled'],
+#     tc.run(with_callback=callback,
 #            skip_on_error=True,
 #            exp_return_value=False)
 
@@ -618,14 +627,14 @@ def test_verify_content_with_changed_file_size_and_no_skipping(mktestcase, piece
     display_filespecs(filespecs, piece_size)  # noqa: F405
     tc = mktestcase(filespecs, piece_size)
     tc.change_file_size()
-    tc.run(with_callback=callback['enabled'],
+    tc.run(with_callback=callback,
            exp_return_value=False)
 
 # def test_verify_content_with_changed_file_size_and_skipping(mktestcase, piece_size, callback, filespecs):
 #     display_filespecs(filespecs, piece_size)  # noqa: F405
 #     tc = mktestcase(filespecs, piece_size)
 #     tc.change_file_size()
-#     tc.run(with_callback=callback['enabled'],
+#     tc.run(with_callback=callback,
 #            skip_on_error=True,
 #            exp_return_value=False)
 
@@ -637,6 +646,6 @@ def test_verify_content_with_multiple_error_types(mktestcase, piece_size, callba
     for _ in range(random.randint(2, len(errorizers))):
         errorizer = errorizers.pop(random.choice(range(len(errorizers))))
         errorizer()
-    tc.run(with_callback=callback['enabled'],
+    tc.run(with_callback=callback,
            # skip_on_error=random.choice((True, False)),
            exp_return_value=False)
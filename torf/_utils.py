@@ -440,27 +440,32 @@ class Filepaths(MonitoredList):
             super().insert(index, path)
 
 
-def is_url(url):
-    """Return whether `url` is a valid URL"""
+def _parse_url(url):
+    """Return parsed `url` or `None` if `url` is not a valid URL"""
     try:
         u = urllib.parse.urlparse(url)
         u.port  # Trigger 'invalid port' exception
     except Exception:
-        return False
+        return None
     else:
         if not u.scheme or not u.netloc:
-            return False
-        return True
+            return None
+        return u
+
+def is_url(url):
+    """Return whether `url` is a valid URL"""
+    return _parse_url(url) is not None
 
 class URL(str):
     def __new__(cls, s):
         return super().__new__(cls, str(s).replace(' ', '+'))
 
     def __init__(self, url):
-        if not is_url(url):
+        parsed = _parse_url(url)
+        if parsed is None:
             raise error.URLError(url)
         else:
-            self._parsed = urllib.parse.urlparse(url)
+            self._parsed = parsed
 
     @property
     def scheme(self): return self._parsed.scheme